@@ -0,0 +1,87 @@
+"""
+Mide el tiempo de arranque del servidor.
+
+Uso:
+    python benchmarks/arranque.py [--servidor gunicorn|runserver] [--repeticiones 5]
+
+Informa dos cifras:
+  * importacion: tiempo de importar ``inventario.wsgi`` (django.setup, apps,
+    URLconf y plantillas) en un interprete nuevo.
+  * primera respuesta: desde que se lanza el servidor hasta que responde
+    200 a la primera peticion de ``--url``.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+MEDIR_IMPORTACION = (
+    'import time; inicio = time.perf_counter(); import inventario.wsgi; '
+    'print(time.perf_counter() - inicio)'
+)
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def medir_importacion(env):
+    salida = subprocess.run([sys.executable, '-c', MEDIR_IMPORTACION], cwd=RAIZ, env=env,
+                            check=True, capture_output=True, text=True)
+    return float(salida.stdout.strip().splitlines()[-1])
+
+
+def medir_primera_respuesta(servidor, url, env, timeout=60):
+    puerto = puerto_libre()
+    if servidor == 'gunicorn':
+        comando = ['gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{puerto}']
+    else:
+        comando = [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{puerto}']
+
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(comando, cwd=RAIZ, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - inicio < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{puerto}{url}', timeout=timeout) as respuesta:
+                    if respuesta.status == 200:
+                        return time.perf_counter() - inicio
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError(f'{servidor} no respondio en {timeout} s')
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--servidor', choices=['gunicorn', 'runserver'], default='gunicorn')
+    parser.add_argument('--url', default='/demo/')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'inventario.settings'}
+    importaciones = [medir_importacion(env) for _ in range(args.repeticiones)]
+    respuestas = [medir_primera_respuesta(args.servidor, args.url, env) for _ in range(args.repeticiones)]
+
+    print(f'importacion        mediana {statistics.median(importaciones) * 1000:8.1f} ms  '
+          f'min {min(importaciones) * 1000:8.1f} ms')
+    print(f'primera respuesta  mediana {statistics.median(respuestas) * 1000:8.1f} ms  '
+          f'min {min(respuestas) * 1000:8.1f} ms  ({args.servidor})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Rendimiento del detalle de Producto con accesos Zipfianos, con y sin cache.
+
+Uso:
+    python benchmarks/cache_productos.py [--productos 10000] [--peticiones 20000] [--s 1.1]
+
+Llena una base de datos de pruebas y lanza ``--peticiones`` GET contra
+``/ajax/productos/<pk>/`` y el detalle de la API eligiendo los ids con una
+distribucion de Zipf de exponente ``--s``. Cada endpoint se mide con la
+cache desactivada y activada; se informa peticiones/s y tasa de aciertos.
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventario.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import Client  # noqa: E402
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+
+from productos.cache import cache_productos, config as config_cache  # noqa: E402
+from productos.models import Producto  # noqa: E402
+
+ENDPOINTS = [
+    '/ajax/productos/{}/',
+    # 'api/' incluye productos.urls antes que '', asi que la API queda en /api/api/
+    '/api/api/productos/{}/',
+]
+
+
+def ids_zipf(ids, n, s, semilla=0):
+    """``n`` ids donde el k-esimo mas popular tiene peso 1 / k**s."""
+    azar = random.Random(semilla)
+    orden = list(ids)
+    azar.shuffle(orden)
+    acumulados = list(itertools.accumulate(1 / k ** s for k in range(1, len(orden) + 1)))
+    return azar.choices(orden, cum_weights=acumulados, k=n)
+
+
+def medir(client, plantilla, secuencia, max_entradas):
+    cache_productos.limpiar()
+    cache_productos.aciertos = cache_productos.fallos = cache_productos.expulsiones = 0
+    with override_settings(INVENTARIO_CACHE_PRODUCTOS={**config_cache(), 'MAX_ENTRADAS': max_entradas}):
+        inicio = time.perf_counter()
+        for pk in secuencia:
+            client.get(plantilla.format(pk))
+        duracion = time.perf_counter() - inicio
+    return len(secuencia) / duracion, cache_productos.estadisticas()['tasa_aciertos']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--productos', type=int, default=10000)
+    parser.add_argument('--peticiones', type=int, default=20000)
+    parser.add_argument('--s', type=float, default=1.1)
+    parser.add_argument('--max-entradas', type=int, default=config_cache()['MAX_ENTRADAS'])
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    runner = DiscoverRunner(verbosity=0)
+    bases = runner.setup_databases()
+    try:
+        Producto.objects.bulk_create([
+            Producto(nombre=f'Producto {i}', descripcion='Descripcion de prueba', precio='9.99', stock=i % 100)
+            for i in range(args.productos)
+        ], batch_size=1000)
+        secuencia = ids_zipf(Producto.objects.values_list('pk', flat=True), args.peticiones, args.s)
+        client = Client()
+        for plantilla in ENDPOINTS:
+            sin_cache, _ = medir(client, plantilla, secuencia, 0)
+            con_cache, tasa = medir(client, plantilla, secuencia, args.max_entradas)
+            print(f'{plantilla:28} sin cache {sin_cache:8.0f} pet/s   '
+                  f'con cache {con_cache:8.0f} pet/s   aciertos {tasa:6.1%}   x{con_cache / sin_cache:.2f}')
+    finally:
+        runner.teardown_databases(bases)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Mide el pico de memoria de los endpoints que recorren tablas completas.
+
+Uso:
+    python benchmarks/memoria_endpoints.py --filas 10000 1000000
+
+Crea una base de datos de pruebas y, para cada tamano, la llena hasta N
+productos y N usuarios. Cada endpoint se sirve con el cliente de pruebas de
+Django consumiendo la respuesta completa (tambien las de streaming) y se
+mide el pico con tracemalloc. Termina con codigo 1 si el pico con la tabla
+mas grande supera ``--tolerancia`` veces el de la mas pequena. El tamano
+mas pequeno debe ser mayor que el bloque de INVENTARIO_ITERACION.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventario.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import Client  # noqa: E402
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from productos.models import Producto  # noqa: E402
+from usuarios.models import Usuario  # noqa: E402
+
+ENDPOINTS = [
+    '/productos/',
+    '/demo/',
+    '/ajax/productos/',
+    # 'api/' incluye productos.urls antes que '', asi que la API queda en /api/api/
+    '/api/api/productos/',
+    '/usuarios/usuarios/',
+    '/usuarios/demo/',
+    '/usuarios/ajax/usuarios/',
+    '/usuarios/api/usuarios/',
+]
+
+LOTE = 10000
+
+
+def llenar(hasta):
+    """Inserta filas hasta tener ``hasta`` productos y usuarios."""
+    for inicio in range(Producto.objects.count(), hasta, LOTE):
+        fin = min(inicio + LOTE, hasta)
+        Producto.objects.bulk_create([
+            Producto(nombre=f'Producto {i}', descripcion='Descripcion de prueba', precio='9.99', stock=i % 100)
+            for i in range(inicio, fin)
+        ])
+    for inicio in range(Usuario.objects.count(), hasta, LOTE):
+        fin = min(inicio + LOTE, hasta)
+        Usuario.objects.bulk_create([
+            Usuario(nombre=f'Usuario {i}', identificacion=str(i), email=f'usuario{i}@ejemplo.com', activo=i % 2 == 0)
+            for i in range(inicio, fin)
+        ])
+
+
+def consumir(response):
+    """Lee la respuesta completa y devuelve su tamano en bytes."""
+    if response.streaming:
+        return sum(len(parte) for parte in response.streaming_content)
+    return len(response.content)
+
+
+def medir(client, url):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    response = client.get(url)
+    tam = consumir(response)
+    duracion = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return response.status_code, pico, tam, duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, nargs='+', default=[10000, 1000000])
+    parser.add_argument('--tolerancia', type=float, default=1.5)
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    runner = DiscoverRunner(verbosity=0)
+    bases = runner.setup_databases()
+    picos = {url: [] for url in ENDPOINTS}
+    try:
+        client = Client()
+        for i, filas in enumerate(sorted(args.filas)):
+            llenar(filas)
+            if i == 0:
+                # Primera peticion fuera de la medicion: compilacion de
+                # plantillas, imports perezosos y caches de Django inflarian
+                # el pico del tamano mas pequeno
+                for url in ENDPOINTS:
+                    consumir(client.get(url))
+            print(f'--- {filas} filas')
+            for url in ENDPOINTS:
+                status, pico, tam, duracion = medir(client, url)
+                picos[url].append(pico)
+                print(f'{url:30} {status}  pico {pico / 1024 / 1024:8.2f} MiB  '
+                      f'respuesta {tam / 1024 / 1024:8.2f} MiB  {duracion:7.2f} s')
+    finally:
+        runner.teardown_databases(bases)
+
+    fallos = [url for url, valores in picos.items() if valores[-1] > valores[0] * args.tolerancia]
+    for url in fallos:
+        print(f'FALLO: el pico de {url} crece con el tamano de la tabla: {picos[url]}')
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+"""
+Configuracion de gunicorn para produccion: ``gunicorn -c gunicorn.conf.py``.
+
+Con ``preload_app`` el proceso maestro importa Django, carga las apps y
+precalienta URLconf y plantillas (inventario/wsgi.py) antes de hacer fork;
+los workers comparten esas paginas de memoria y sirven la primera peticion
+sin pagar la importacion.
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = 'inventario.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+preload_app = True
+accesslog = '-'
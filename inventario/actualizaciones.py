@@ -0,0 +1,90 @@
+"""
+Utilidades compartidas para actualizar modelos escribiendo solo lo necesario.
+
+Las vistas calculan que campos cambiaron realmente, guardan unicamente esos
+con ``update_fields`` y, si el cliente envia ``If-Match``, hacen un UPDATE
+condicional sobre la columna ``version`` (concurrencia optimista).
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, pre_save
+
+
+class ConflictoDeVersion(Exception):
+    """El registro fue modificado por otro cliente desde que se leyo."""
+
+
+def aplicar_cambios(instance, cambios):
+    """Asigna los valores de ``cambios`` a la instancia y devuelve la lista
+    de campos cuyo valor es distinto del actual."""
+    modificados = []
+    for nombre, valor in cambios.items():
+        campo = instance._meta.get_field(nombre)
+        nuevo = campo.to_python(valor)
+        if getattr(instance, campo.attname) != nuevo:
+            setattr(instance, campo.attname, nuevo)
+            modificados.append(nombre)
+    return modificados
+
+
+def version_esperada(request):
+    """Lee las versiones aceptadas en ``If-Match`` (admite lista separada por
+    comas). Devuelve None si no hay cabecera o si es ``*`` (cualquier
+    version). Las etiquetas que no son versiones nunca coinciden."""
+    valor = request.headers.get('If-Match', '').strip()
+    if not valor or valor == '*':
+        return None
+    versiones = set()
+    for etiqueta in valor.split(','):
+        etiqueta = etiqueta.strip()
+        if etiqueta.startswith('W/'):
+            etiqueta = etiqueta[2:]
+        try:
+            versiones.add(int(etiqueta.strip('"')))
+        except ValueError:
+            pass
+    return versiones
+
+
+def etag(instance):
+    return f'"{instance.version}"'
+
+
+def guardar_cambios(instance, campos, versiones=None):
+    """Persiste solo ``campos`` e incrementa ``version``.
+
+    Sin cambios no se escribe nada. Con ``versiones`` (las de ``If-Match``)
+    el UPDATE solo se aplica si la fila sigue en la version leida y esta es
+    una de ellas; si no, lanza ConflictoDeVersion sin haber tomado ningun
+    bloqueo.
+    """
+    if versiones is not None and instance.version not in versiones:
+        raise ConflictoDeVersion()
+    if not campos:
+        return False
+
+    modelo = type(instance)
+    if versiones is None:
+        instance.version = F('version') + 1
+        instance.save(update_fields=[*campos, 'version'])
+        instance.refresh_from_db(fields=['version'])
+        return True
+
+    version = instance.version
+    attnames = [modelo._meta.get_field(c).attname for c in campos]
+    valores = {attname: getattr(instance, attname) for attname in attnames}
+    using = instance._state.db
+    # QuerySet.update() no emite pre_save/post_save; los enviamos para que los
+    # receptores vean las mismas senales que con save(update_fields=...), y
+    # en la misma transaccion que el UPDATE: un conflicto deshace tambien lo
+    # que hayan escrito.
+    with transaction.atomic(using=using):
+        pre_save.send(sender=modelo, instance=instance, raw=False, using=using, update_fields=frozenset(campos))
+        filas = modelo.objects.filter(pk=instance.pk, version=version).update(version=F('version') + 1, **valores)
+        if not filas:
+            raise ConflictoDeVersion()
+        instance.version = version + 1
+        post_save.send(sender=modelo, instance=instance, created=False,
+                       update_fields=frozenset(campos), raw=False, using=using)
+    return True
@@ -0,0 +1,25 @@
+"""
+Precalentamiento del proceso antes de servir peticiones.
+
+Django importa el URLconf (y con el todos los modulos de vistas) y compila
+las plantillas de forma perezosa en la primera peticion. Con gunicorn y
+``preload_app`` esto se ejecuta una sola vez en el proceso maestro, antes
+del fork, y los workers heredan el trabajo hecho.
+"""
+
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+PLANTILLAS = [
+    'productos/producto_list.html',
+    'usuarios/usuario_list.html',
+]
+
+
+def precalentar():
+    get_resolver().url_patterns
+    for nombre in PLANTILLAS:
+        get_template(nombre)
+    # Ninguna conexion abierta aqui debe compartirse entre workers
+    connections.close_all()
@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventario.settings')
 
 application = get_asgi_application()
+
+from inventario.arranque import precalentar  # noqa: E402
+
+precalentar()
@@ -0,0 +1,107 @@
+"""
+Descarte adaptativo de carga para las rutas de escritura.
+
+El middleware mira tres senales:
+  * el tiempo que la peticion espero en cola antes de llegar al worker,
+    calculado con la cabecera ``X-Request-Start`` que anade el proxy
+    (nginx: ``proxy_set_header X-Request-Start "t=${msec}";``). Es la
+    medida real del atasco: con workers sincronos la cola esta delante de
+    ellos, no dentro.
+  * las peticiones en curso en este worker; el umbral es por worker y solo
+    tiene sentido con workers de varios hilos.
+  * la latencia media (EWMA) de las consultas a la base de datos.
+Si alguna supera su umbral, las escrituras a vistas de DRF se rechazan con
+503 y ``Retry-After`` para que las lecturas mantengan una latencia acotada.
+Los umbrales se configuran en ``INVENTARIO_CARGA``.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.views import APIView
+
+CONFIG_POR_DEFECTO = {
+    'MAX_ESPERA_COLA': 0.5,
+    'MAX_EN_CURSO': 32,
+    'MAX_LATENCIA_DB': 0.25,
+    # Muestras de latencia mas antiguas que esto se ignoran
+    'VENTANA_LATENCIA': 5,
+    'RETRY_AFTER': 1,
+}
+
+
+def espera_en_cola(request, ahora=None):
+    """Segundos desde ``X-Request-Start`` (s, ms o us, con o sin ``t=``), o None."""
+    valor = request.headers.get('X-Request-Start', '').strip()
+    if valor.startswith('t='):
+        valor = valor[2:]
+    try:
+        inicio = float(valor)
+    except ValueError:
+        return None
+    if inicio > 1e14:
+        inicio /= 1e6
+    elif inicio > 1e11:
+        inicio /= 1e3
+    return max(0.0, (ahora or time.time()) - inicio)
+
+
+class LoadSheddingMiddleware:
+    ALPHA = 0.2
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = {**CONFIG_POR_DEFECTO, **getattr(settings, 'INVENTARIO_CARGA', {})}
+        self._lock = threading.Lock()
+        self._en_curso = 0
+        self._latencia_db = 0.0
+        self._ultima_muestra = 0.0
+
+    def __call__(self, request):
+        with self._lock:
+            self._en_curso += 1
+        try:
+            with connection.execute_wrapper(self._medir_consulta):
+                return self.get_response(request)
+        finally:
+            with self._lock:
+                self._en_curso -= 1
+
+    def _medir_consulta(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            with self._lock:
+                self._latencia_db += self.ALPHA * (duracion - self._latencia_db)
+                self._ultima_muestra = time.monotonic()
+
+    def latencia_db(self):
+        if time.monotonic() - self._ultima_muestra > self.config['VENTANA_LATENCIA']:
+            return 0.0
+        return self._latencia_db
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in SAFE_METHODS:
+            return None
+        if not issubclass(getattr(view_func, 'cls', object), APIView):
+            return None
+
+        espera = espera_en_cola(request)
+        if espera is not None and espera > self.config['MAX_ESPERA_COLA']:
+            motivo = 'Demasiadas peticiones en cola'
+        # La peticion actual tambien cuenta como en curso
+        elif self._en_curso > self.config['MAX_EN_CURSO']:
+            motivo = 'Demasiadas peticiones en curso'
+        elif self.latencia_db() > self.config['MAX_LATENCIA_DB']:
+            motivo = 'Base de datos saturada'
+        else:
+            return None
+        response = JsonResponse({'error': 'Servicio sobrecargado', 'detalles': motivo}, status=503)
+        response['Retry-After'] = str(self.config['RETRY_AFTER'])
+        return response
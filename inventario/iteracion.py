@@ -0,0 +1,66 @@
+"""
+Iteracion por bloques para las rutas que recorren tablas completas.
+
+En lugar de evaluar el queryset (y cachear todas las instancias) se usa
+``QuerySet.iterator()``, que lee las filas en bloques con un cursor del
+lado del servidor. El tamano del bloque se deriva del presupuesto de
+memoria configurado en ``INVENTARIO_ITERACION``.
+"""
+
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+CONFIG_POR_DEFECTO = {
+    # Memoria maxima que puede ocupar un bloque de instancias
+    'PRESUPUESTO_MEMORIA': 4 * 1024 * 1024,
+    # Estimacion del coste de una fila (instancia + datos serializados)
+    'BYTES_POR_FILA': 2048,
+    # Filas por pagina en las vistas HTML
+    'FILAS_POR_PAGINA': 50,
+}
+
+
+def config():
+    return {**CONFIG_POR_DEFECTO, **getattr(settings, 'INVENTARIO_ITERACION', {})}
+
+
+def tam_bloque():
+    conf = config()
+    return max(1, conf['PRESUPUESTO_MEMORIA'] // conf['BYTES_POR_FILA'])
+
+
+def bloques(queryset, tam=None):
+    """Genera listas de como mucho ``tam`` instancias sin cachear el queryset."""
+    tam = tam or tam_bloque()
+    bloque = []
+    for obj in queryset.iterator(chunk_size=tam):
+        bloque.append(obj)
+        if len(bloque) >= tam:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def json_en_bloques(queryset, serializer_class):
+    """Serializa el queryset como un array JSON, un bloque cada vez."""
+    # Un unico serializer para todos los bloques: los serializers de DRF
+    # forman ciclos de referencias y crear uno por bloque retendria cada
+    # bloque hasta la siguiente recoleccion completa del GC.
+    serializer = serializer_class()
+    yield b'['
+    primero = True
+    for bloque in bloques(queryset):
+        datos = [serializer.to_representation(obj) for obj in bloque]
+        cuerpo = json.dumps(datos, cls=DjangoJSONEncoder)[1:-1]
+        yield (cuerpo if primero else ', ' + cuerpo).encode('utf-8')
+        primero = False
+    yield b']'
+
+
+def respuesta_json_en_bloques(queryset, serializer_class):
+    """Equivalente a ``JsonResponse(serializer.data, safe=False)`` con memoria acotada."""
+    return StreamingHttpResponse(json_en_bloques(queryset, serializer_class), content_type='application/json')
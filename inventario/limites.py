@@ -0,0 +1,166 @@
+"""
+Limites de tasa para las rutas de escritura (AJAX y API).
+
+Se implementan como un throttle de DRF basado en token bucket con dos
+cubetas: una por cliente y otra global. Cada cubeta tiene capacidad igual al
+numero de peticiones de su tasa en ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``
+(``escritura_cliente`` y ``escritura_global``) y se rellena de forma continua.
+Por defecto las cubetas viven en memoria del proceso; si
+``INVENTARIO_THROTTLE_CACHE`` apunta a un alias de ``CACHES`` (solo Redis) se
+guardan alli para compartirlas entre workers.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import Throttled
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURACIONES = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class MemoriaBackend:
+    """Cubetas en un LRU protegido por lock, compartido entre hilos.
+
+    Al superar ``MAX_CUBETAS`` se descarta la cubeta usada hace mas tiempo,
+    de modo que la memoria y el coste por peticion quedan acotados aunque
+    lleguen muchos clientes distintos.
+    """
+
+    MAX_CUBETAS = 10000
+
+    def __init__(self):
+        self._cubetas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consumir(self, clave, capacidad, tasa, ahora):
+        with self._lock:
+            tokens, ultimo = self._cubetas.get(clave, (capacidad, ahora))
+            tokens = min(capacidad, tokens + (ahora - ultimo) * tasa)
+            if tokens >= 1:
+                tokens -= 1
+                espera = 0.0
+            else:
+                espera = (1 - tokens) / tasa
+            self._cubetas[clave] = (tokens, ahora)
+            self._cubetas.move_to_end(clave)
+            if len(self._cubetas) > self.MAX_CUBETAS:
+                self._cubetas.popitem(last=False)
+            return espera
+
+    def limpiar(self):
+        with self._lock:
+            self._cubetas.clear()
+
+
+class RedisBackend:
+    """Cubetas en Redis, compartidas entre workers y contenedores.
+
+    Cada consumo es un script Lua que lee, rellena y descuenta la cubeta en
+    una sola operacion atomica, usando el reloj de Redis para que todos los
+    workers vean el mismo tiempo (``ahora`` se ignora).
+    """
+
+    SCRIPT = """
+        local capacidad = tonumber(ARGV[1])
+        local tasa = tonumber(ARGV[2])
+        local reloj = redis.call('TIME')
+        local ahora = tonumber(reloj[1]) + tonumber(reloj[2]) / 1000000
+        local cubeta = redis.call('HMGET', KEYS[1], 'tokens', 'ultimo')
+        local tokens = tonumber(cubeta[1]) or capacidad
+        local ultimo = tonumber(cubeta[2]) or ahora
+        tokens = math.min(capacidad, tokens + math.max(0, ahora - ultimo) * tasa)
+        local espera = 0
+        if tokens >= 1 then
+            tokens = tokens - 1
+        else
+            espera = (1 - tokens) / tasa
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'ultimo', ahora)
+        redis.call('EXPIRE', KEYS[1], ARGV[3])
+        return tostring(espera)
+    """
+
+    def __init__(self, cache):
+        if not isinstance(cache, RedisCache):
+            raise ImproperlyConfigured('INVENTARIO_THROTTLE_CACHE debe apuntar a una cache RedisCache')
+        self.cache = cache
+
+    def consumir(self, clave, capacidad, tasa, ahora):
+        clave = self.cache.make_and_validate_key(clave)
+        cliente = self.cache._cache.get_client(clave, write=True)
+        # Pasado el tiempo de rellenado completo la entrada ya no hace falta
+        expira = math.ceil(capacidad / tasa)
+        return float(cliente.register_script(self.SCRIPT)(keys=[clave], args=[capacidad, tasa, expira]))
+
+
+_memoria = MemoriaBackend()
+
+
+def get_backend():
+    alias = getattr(settings, 'INVENTARIO_THROTTLE_CACHE', None)
+    if alias:
+        return RedisBackend(caches[alias])
+    return _memoria
+
+
+def get_tasa(scope):
+    """Devuelve ``(peticiones, segundos)`` de la tasa de ``scope`` o None."""
+    tasa = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+    if tasa is None:
+        return None
+    num, periodo = tasa.split('/')
+    return int(num), DURACIONES[periodo[0]]
+
+
+class EscrituraThrottle(BaseThrottle):
+    """Limita los metodos de escritura por cliente y globalmente.
+
+    La cubeta global solo se consulta cuando el cliente aun tiene cupo: las
+    peticiones rechazadas por su propio limite no gastan tokens globales, asi
+    que un cliente en bucle no bloquea las escrituras de los demas. El cliente
+    se identifica por IP segun ``NUM_PROXIES``.
+    """
+    cache_format = 'throttle_%(scope)s_%(ident)s'
+
+    def allow_request(self, request, view):
+        self.espera = 0.0
+        if request.method in SAFE_METHODS:
+            return True
+        backend = get_backend()
+        ahora = time.time()
+        for scope, ident in (('escritura_cliente', self.get_ident(request)), ('escritura_global', 'global')):
+            tasa = get_tasa(scope)
+            if tasa is None:
+                continue
+            num, duracion = tasa
+            clave = self.cache_format % {'scope': scope, 'ident': ident}
+            self.espera = backend.consumir(clave, num, num / duracion, ahora)
+            if self.espera:
+                return False
+        return True
+
+    def wait(self):
+        return math.ceil(self.espera)
+
+
+def manejador_excepciones(exc, context):
+    """Manejador de DRF que da a los 429 el formato de error del resto de la API."""
+    # rest_framework.views importa DEFAULT_THROTTLE_CLASSES (este modulo) al cargarse
+    from rest_framework.views import exception_handler
+
+    response = exception_handler(exc, context)
+    if isinstance(exc, Throttled) and response is not None:
+        response.data = {
+            'error': 'Demasiadas peticiones',
+            'detalles': f'Reintente en {exc.wait} s' if exc.wait is not None else '',
+        }
+    return response
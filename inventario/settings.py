@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -31,7 +32,6 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -40,10 +40,18 @@ INSTALLED_APPS = [
     'rest_framework',
     'productos',
     'usuarios',
+    'reportes',
 ]
 
+# El admin es la aplicacion mas pesada de importar y no se usa en los
+# contenedores de produccion: DJANGO_ADMIN=0 la deja fuera del arranque.
+ADMIN_HABILITADO = os.environ.get('DJANGO_ADMIN', '1') == '1'
+if ADMIN_HABILITADO:
+    INSTALLED_APPS.insert(0, 'django.contrib.admin')
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'inventario.carga.LoadSheddingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,6 +62,64 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'inventario.urls'
 
+
+# Limites de tasa y descarte de carga para las rutas de escritura
+
+REST_FRAMEWORK = {
+    'DEFAULT_THROTTLE_CLASSES': [
+        'inventario.limites.EscrituraThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'escritura_cliente': '60/min',
+        'escritura_global': '600/min',
+    },
+    # Proxies de confianza delante de la app; con 0 se ignora X-Forwarded-For
+    # y el cliente es REMOTE_ADDR, asi que la cabecera no permite saltarse el limite.
+    'NUM_PROXIES': int(os.environ.get('DJANGO_NUM_PROXIES', 0)),
+    'EXCEPTION_HANDLER': 'inventario.limites.manejador_excepciones',
+}
+
+REDIS_URL = os.environ.get('REDIS_URL')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+if REDIS_URL:
+    # Cache compartida por todos los workers y contenedores
+    CACHES['limites'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+
+# Alias de CACHES (debe ser Redis) para compartir las cubetas entre workers.
+# Sin Redis las cubetas viven en memoria del proceso y el limite global pasa a
+# ser por worker
+INVENTARIO_THROTTLE_CACHE = os.environ.get('DJANGO_THROTTLE_CACHE', 'limites' if REDIS_URL else '') or None
+
+INVENTARIO_CARGA = {
+    # Espera maxima en la cola del proxy (X-Request-Start)
+    'MAX_ESPERA_COLA': 0.5,
+    # Por worker: con workers sincronos (un hilo) no puede pasar de 1
+    'MAX_EN_CURSO': 2 * int(os.environ.get('GUNICORN_THREADS', 1)),
+    'MAX_LATENCIA_DB': 0.25,
+    'RETRY_AFTER': 1,
+}
+
+# Presupuesto de memoria para recorrer tablas completas por bloques
+INVENTARIO_ITERACION = {
+    'PRESUPUESTO_MEMORIA': 4 * 1024 * 1024,
+    'BYTES_POR_FILA': 2048,
+    'FILAS_POR_PAGINA': 50,
+}
+
+# Cache en proceso del JSON de detalle de Producto (0 entradas = desactivada)
+INVENTARIO_CACHE_PRODUCTOS = {
+    'MAX_ENTRADAS': 1024,
+    'TTL': 5,
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
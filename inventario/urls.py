@@ -1,9 +1,14 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/', include('productos.urls')),
     path('', include('productos.urls')),
     path('usuarios/', include('usuarios.urls')),
-]
\ No newline at end of file
+    path('reportes/', include('reportes.urls')),
+]
+
+if settings.ADMIN_HABILITADO:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
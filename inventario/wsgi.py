@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventario.settings')
 
 application = get_wsgi_application()
+
+from inventario.arranque import precalentar  # noqa: E402
+
+precalentar()
@@ -0,0 +1,121 @@
+"""
+Cache en proceso del JSON de detalle de cada Producto.
+
+Guarda los bytes ya codificados (y el ETag) de los productos mas pedidos en
+un LRU acotado, compartido por todos los hilos del proceso. Las senales de
+Producto invalidan la entrada al guardar o eliminar (productos/signals.py).
+Cada worker tiene su propia cache y solo ve sus propias invalidaciones, por
+eso las entradas caducan tras ``TTL`` segundos: es el retraso maximo con el
+que un worker puede ver un cambio hecho en otro.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+CONFIG_POR_DEFECTO = {
+    # 0 desactiva la cache
+    'MAX_ENTRADAS': 1024,
+    'TTL': 5,
+}
+
+
+def config():
+    return {**CONFIG_POR_DEFECTO, **getattr(settings, 'INVENTARIO_CACHE_PRODUCTOS', {})}
+
+
+class CacheLRU:
+    """LRU con caducidad. Sin ``max_entradas``/``ttl`` explicitos se leen de
+    ``INVENTARIO_CACHE_PRODUCTOS`` en cada uso, como el resto de ajustes.
+
+    Cada clave lleva su propia generacion, que ``invalidar`` incrementa: una
+    lectura de la base de datos solo se descarta si su clave se invalido
+    mientras tanto. ``limpiar`` cambia la epoca y descarta todas.
+    """
+
+    # Claves con generacion propia; al superarlo se reinician todas
+    MAX_GENERACIONES = 100000
+
+    def __init__(self, max_entradas=None, ttl=None):
+        self._max_entradas = max_entradas
+        self._ttl = ttl
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoca = 0
+        self._generaciones = {}
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    @property
+    def max_entradas(self):
+        return config()['MAX_ENTRADAS'] if self._max_entradas is None else self._max_entradas
+
+    @property
+    def ttl(self):
+        return config()['TTL'] if self._ttl is None else self._ttl
+
+    def get(self, clave):
+        ahora = time.monotonic()
+        activa = self.max_entradas > 0
+        with self._lock:
+            entrada = self._entradas.get(clave) if activa else None
+            if entrada is None or entrada[0] < ahora:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def generacion(self, clave):
+        """Marca a tomar antes de leer ``clave`` de la base de datos y pasar a ``set``."""
+        with self._lock:
+            return self._epoca, self._generaciones.get(clave, 0)
+
+    def set(self, clave, valor, generacion):
+        """Guarda ``valor`` salvo que ``clave`` se haya invalidado desde
+        ``generacion``: en ese caso lo leido puede ser anterior al cambio."""
+        max_entradas = self.max_entradas
+        if max_entradas <= 0:
+            return
+        caduca = time.monotonic() + self.ttl
+        with self._lock:
+            if generacion != (self._epoca, self._generaciones.get(clave, 0)):
+                return
+            self._entradas[clave] = (caduca, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > max_entradas:
+                self._entradas.popitem(last=False)
+                self.expulsiones += 1
+
+    def invalidar(self, clave):
+        with self._lock:
+            if clave not in self._generaciones and len(self._generaciones) >= self.MAX_GENERACIONES:
+                self._epoca += 1
+                self._generaciones.clear()
+            self._generaciones[clave] = self._generaciones.get(clave, 0) + 1
+            self._entradas.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._epoca += 1
+            self._generaciones.clear()
+            self._entradas.clear()
+
+    def estadisticas(self):
+        max_entradas = self.max_entradas
+        with self._lock:
+            peticiones = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'max_entradas': max_entradas,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'expulsiones': self.expulsiones,
+                'tasa_aciertos': self.aciertos / peticiones if peticiones else 0.0,
+            }
+
+
+cache_productos = CacheLRU()
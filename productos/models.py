@@ -6,6 +6,7 @@ class Producto(models.Model):
     precio = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0) 
     creado = models.DateTimeField(auto_now_add=True)
+    version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.nombre
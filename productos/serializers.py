@@ -4,4 +4,5 @@ from .models import Producto
 class ProductoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Producto
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        read_only_fields = ['version']
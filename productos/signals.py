@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import cache_productos
+from .models import Producto
+
+
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+def invalidar_cache(sender, instance, **kwargs):
+    pk = instance.pk
+    cache_productos.invalidar(pk)
+    # Otra peticion podria volver a llenar la entrada con la fila anterior
+    # antes de que la transaccion confirme el cambio
+    transaction.on_commit(lambda: cache_productos.invalidar(pk))
@@ -1,3 +1,342 @@
-from django.test import TestCase
+import json
+import threading
+import time
+import unittest
+import uuid
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models.signals import post_save
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.permissions import BasePermission
+
+from inventario import limites
+from .cache import CacheLRU, cache_productos
+from .models import Producto
+from .serializers import ProductoSerializer
+from .views import ProductoDetailAPIView
+
+
+class ActualizacionParcialTests(TestCase):
+
+    def setUp(self):
+        limites._memoria.limpiar()
+        self.producto = Producto.objects.create(nombre='Teclado', descripcion='USB', precio='10.00', stock=5)
+
+    def put_ajax(self, datos, **extra):
+        return self.client.put(f'/ajax/productos/{self.producto.pk}/', json.dumps(datos),
+                               content_type='application/json', **extra)
+
+    def patch_api(self, datos, **extra):
+        return self.client.patch(f'/api/api/productos/{self.producto.pk}/', json.dumps(datos),
+                                 content_type='application/json', **extra)
+
+    def updates(self, queries):
+        return [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+
+    def test_put_sin_cambios_no_escribe(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.put_ajax({'nombre': 'Teclado', 'precio': '10.0', 'stock': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.updates(queries), [])
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.version, 0)
+        self.assertEqual(response['ETag'], '"0"')
+
+    def test_put_api_sin_cambios_no_incrementa_version(self):
+        response = self.client.put(f'/api/api/productos/{self.producto.pk}/', json.dumps({
+            'nombre': 'Teclado', 'descripcion': 'USB', 'precio': '10.00', 'stock': 5,
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.version, 0)
+
+    def test_patch_escribe_solo_columnas_cambiadas(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.patch_api({'stock': 7, 'nombre': 'Teclado'})
+        self.assertEqual(response.status_code, 200)
+        updates = self.updates(queries)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"stock"', updates[0])
+        for columna in ('"nombre"', '"descripcion"', '"precio"', '"creado"'):
+            self.assertNotIn(columna, updates[0].split('WHERE')[0])
+        self.producto.refresh_from_db()
+        self.assertEqual((self.producto.stock, self.producto.version), (7, 1))
+
+    def test_if_match_obsoleto_devuelve_412(self):
+        self.put_ajax({'stock': 6})
+        response = self.put_ajax({'stock': 8}, HTTP_IF_MATCH='"0"')
+        self.assertEqual(response.status_code, 412)
+        response = self.patch_api({'stock': 8}, HTTP_IF_MATCH='"0"')
+        self.assertEqual(response.status_code, 412)
+        self.producto.refresh_from_db()
+        self.assertEqual((self.producto.stock, self.producto.version), (6, 1))
+
+    def test_if_match_en_lista(self):
+        response = self.patch_api({'stock': 8}, HTTP_IF_MATCH='"2", W/"0"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"1"')
+        response = self.patch_api({'stock': 9}, HTTP_IF_MATCH='"5", "x"')
+        self.assertEqual(response.status_code, 412)
+
+    def test_update_condicional_emite_post_save(self):
+        recibidas = []
+
+        def receptor(sender, instance, created, update_fields, **kwargs):
+            recibidas.append((instance.pk, created, update_fields))
+
+        post_save.connect(receptor, sender=Producto)
+        self.addCleanup(post_save.disconnect, receptor, sender=Producto)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.put_ajax({'stock': 9}, HTTP_IF_MATCH='"0"')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('"version" = 0', self.updates(queries)[0])
+        self.assertEqual(recibidas, [(self.producto.pk, False, frozenset({'stock'}))])
+
+
+LIMITES_PRUEBA = {
+    'DEFAULT_THROTTLE_CLASSES': ['inventario.limites.EscrituraThrottle'],
+    'DEFAULT_THROTTLE_RATES': {'escritura_cliente': '3/min', 'escritura_global': '5/min'},
+    'NUM_PROXIES': 0,
+    'EXCEPTION_HANDLER': 'inventario.limites.manejador_excepciones',
+}
+
+
+@override_settings(REST_FRAMEWORK=LIMITES_PRUEBA)
+class LimitesEscrituraTests(TestCase):
+
+    def setUp(self):
+        limites._memoria.limpiar()
+
+    def crear(self, ip, **extra):
+        return self.client.post('/ajax/productos/', {'nombre': 'x', 'precio': '1', 'stock': 1},
+                                REMOTE_ADDR=ip, **extra)
+
+    def test_cliente_en_bucle_no_bloquea_a_otros(self):
+        codigos = [self.crear('10.0.0.1').status_code for _ in range(20)]
+        self.assertEqual(codigos.count(200), 3)
+        self.assertEqual(codigos.count(429), 17)
+        self.assertEqual(self.crear('10.0.0.2').status_code, 200)
+
+    def test_respuesta_429_usa_formato_de_error(self):
+        for _ in range(3):
+            self.crear('10.0.0.1')
+        response = self.crear('10.0.0.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(set(response.json()), {'error', 'detalles'})
+
+    def test_x_forwarded_for_no_evita_el_limite(self):
+        codigos = [self.crear('10.0.0.1', HTTP_X_FORWARDED_FOR=f'192.168.0.{i}').status_code for i in range(10)]
+        self.assertEqual(codigos.count(200), 3)
+
+    def test_lecturas_no_se_limitan(self):
+        for _ in range(10):
+            self.assertEqual(self.client.get('/ajax/productos/', REMOTE_ADDR='10.0.0.1').status_code, 200)
+
+    def test_memoria_acotada_con_lru(self):
+        backend = limites.MemoriaBackend()
+        backend.MAX_CUBETAS = 3
+        for i in range(5):
+            backend.consumir(f'c{i}', 1, 1 / 60, 0)
+        self.assertEqual(list(backend._cubetas), ['c2', 'c3', 'c4'])
+        # Un cliente sin cupo sigue limitado mientras su cubeta este en el LRU
+        self.assertGreater(backend.consumir('c4', 1, 1 / 60, 0), 0)
+
+    @override_settings(INVENTARIO_THROTTLE_CACHE='default')
+    def test_cache_compartida_exige_redis(self):
+        with self.assertRaises(ImproperlyConfigured):
+            limites.get_backend()
+
+
+@unittest.skipUnless(settings.REDIS_URL, 'requiere REDIS_URL')
+class RedisBackendTests(TestCase):
+
+    def test_consumo_concurrente_es_atomico(self):
+        backend = limites.RedisBackend(caches['limites'])
+        clave = f'prueba_{uuid.uuid4().hex}'
+        esperas = []
+
+        def consumir():
+            esperas.append(backend.consumir(clave, 5, 5 / 60, None))
+
+        hilos = [threading.Thread(target=consumir) for _ in range(20)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(esperas.count(0), 5)
+        caches['limites'].delete(clave)
+
+
+class DescarteCargaTests(TestCase):
+
+    def setUp(self):
+        limites._memoria.limpiar()
+
+    def test_escritura_con_espera_en_cola_devuelve_503(self):
+        inicio = f't={time.time() - 2:.3f}'
+        response = self.client.post('/ajax/productos/', {'nombre': 'x', 'precio': '1'}, HTTP_X_REQUEST_START=inicio)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(self.client.get('/ajax/productos/', HTTP_X_REQUEST_START=inicio).status_code, 200)
+
+    def test_espera_corta_no_descarta(self):
+        inicio = str(int(time.time() * 1000))
+        response = self.client.post('/ajax/productos/', {'nombre': 'x', 'precio': '1'}, HTTP_X_REQUEST_START=inicio)
+        self.assertEqual(response.status_code, 200)
+
+
+class ListaHtmlTests(TestCase):
+
+    def test_paginacion_lee_la_configuracion_en_cada_peticion(self):
+        for i in range(5):
+            Producto.objects.create(nombre=f'p{i}', precio=1)
+        with self.settings(INVENTARIO_ITERACION={'FILAS_POR_PAGINA': 2}):
+            response = self.client.get('/productos/')
+        self.assertEqual(len(response.context['productos']), 2)
+        self.assertEqual(response.context['page_obj'].paginator.num_pages, 3)
+
+
+
+# Bloques de 2 filas
+@override_settings(INVENTARIO_ITERACION={'PRESUPUESTO_MEMORIA': 2, 'BYTES_POR_FILA': 1})
+class ListaJsonEnBloquesTests(TestCase):
+
+    def contenido(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return json.loads(b''.join(response.streaming_content))
+
+    def esperado(self):
+        datos = ProductoSerializer(Producto.objects.all(), many=True).data
+        return json.loads(json.dumps(datos, cls=DjangoJSONEncoder))
+
+    def test_varios_bloques_forman_un_json_valido(self):
+        for i in range(5):
+            Producto.objects.create(nombre=f'p{i}', descripcion='"comillas"', precio='1.50', stock=i)
+        for url in ('/ajax/productos/', '/api/api/productos/'):
+            datos = self.contenido(url)
+            self.assertEqual(len(datos), 5)
+            self.assertEqual(datos, self.esperado())
+
+    def test_tabla_vacia(self):
+        for url in ('/ajax/productos/', '/api/api/productos/'):
+            self.assertEqual(self.contenido(url), [])
+
+class CacheLRUTests(TestCase):
+
+    def test_expulsa_la_menos_usada(self):
+        cache = CacheLRU(max_entradas=2, ttl=60)
+        for clave in (1, 2):
+            cache.set(clave, clave, cache.generacion(clave))
+        cache.get(1)
+        cache.set(3, 3, cache.generacion(3))
+        self.assertEqual((cache.get(1), cache.get(2), cache.get(3)), (1, None, 3))
+        self.assertEqual(cache.expulsiones, 1)
+
+    def test_entrada_caduca_tras_ttl(self):
+        cache = CacheLRU(max_entradas=2, ttl=5)
+        with mock.patch('productos.cache.time.monotonic', return_value=100):
+            cache.set(1, 'a', cache.generacion(1))
+            self.assertEqual(cache.get(1), 'a')
+        with mock.patch('productos.cache.time.monotonic', return_value=106):
+            self.assertIsNone(cache.get(1))
+
+    def test_no_guarda_lecturas_anteriores_a_una_invalidacion(self):
+        cache = CacheLRU(max_entradas=2, ttl=60)
+        generacion = cache.generacion(1)
+        cache.invalidar(1)
+        cache.set(1, 'obsoleto', generacion)
+        self.assertIsNone(cache.get(1))
+
+    def test_invalidar_una_clave_no_afecta_a_otras(self):
+        cache = CacheLRU(max_entradas=2, ttl=60)
+        generacion = cache.generacion(2)
+        cache.invalidar(1)
+        cache.set(2, 'b', generacion)
+        self.assertEqual(cache.get(2), 'b')
+
+    def test_limpiar_descarta_lecturas_en_curso(self):
+        cache = CacheLRU(max_entradas=2, ttl=60)
+        generacion = cache.generacion(1)
+        cache.limpiar()
+        cache.set(1, 'a', generacion)
+        self.assertIsNone(cache.get(1))
+
+    def test_lee_la_configuracion_en_cada_uso(self):
+        cache = CacheLRU()
+        with self.settings(INVENTARIO_CACHE_PRODUCTOS={'MAX_ENTRADAS': 1, 'TTL': 60}):
+            for clave in (1, 2):
+                cache.set(clave, clave, cache.generacion(clave))
+            self.assertEqual((cache.get(1), cache.get(2)), (None, 2))
+        with self.settings(INVENTARIO_CACHE_PRODUCTOS={'MAX_ENTRADAS': 0}):
+            self.assertIsNone(cache.get(2))
+            self.assertEqual(cache.estadisticas()['max_entradas'], 0)
+
+    def test_estadisticas(self):
+        cache = CacheLRU(max_entradas=2, ttl=60)
+        cache.get(1)
+        cache.set(1, 'a', cache.generacion(1))
+        cache.get(1)
+        self.assertEqual(cache.estadisticas()['tasa_aciertos'], 0.5)
+
+
+class CacheDetalleTests(TestCase):
+
+    def setUp(self):
+        limites._memoria.limpiar()
+        cache_productos.limpiar()
+        self.producto = Producto.objects.create(nombre='Teclado', precio='10.00', stock=5)
+        self.url_ajax = f'/ajax/productos/{self.producto.pk}/'
+        self.url_api = f'/api/api/productos/{self.producto.pk}/'
+
+    def stock(self, url):
+        return json.loads(self.client.get(url).content)['stock']
+
+    def test_segunda_lectura_no_consulta_la_base_de_datos(self):
+        self.client.get(self.url_api)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url_ajax)
+        self.assertEqual(response['ETag'], '"0"')
+
+    @override_settings(INVENTARIO_CACHE_PRODUCTOS={'MAX_ENTRADAS': 0})
+    def test_cache_desactivada_por_configuracion(self):
+        self.client.get(self.url_api)
+        with self.assertNumQueries(1):
+            self.client.get(self.url_ajax)
+
+    def test_put_ajax_invalida(self):
+        self.stock(self.url_api)
+        self.client.put(self.url_ajax, json.dumps({'stock': 9}), content_type='application/json')
+        self.assertEqual(self.stock(self.url_api), 9)
+
+    def test_patch_con_if_match_invalida(self):
+        self.stock(self.url_ajax)
+        response = self.client.patch(self.url_api, json.dumps({'stock': 3}), content_type='application/json',
+                                     HTTP_IF_MATCH='"0"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stock(self.url_ajax), 3)
+
+    def test_delete_invalida(self):
+        self.stock(self.url_ajax)
+        self.client.delete(self.url_ajax)
+        self.assertEqual(self.client.get(self.url_ajax).status_code, 404)
+        self.assertEqual(self.client.get(self.url_api).status_code, 404)
+
+    def test_permiso_por_objeto_no_usa_la_cache(self):
+        class SoloLectura(BasePermission):
+            def has_object_permission(self, request, view, obj):
+                return False
+
+        self.stock(self.url_api)
+        with mock.patch.object(ProductoDetailAPIView, 'permission_classes', [SoloLectura]):
+            response = self.client.get(self.url_api)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn(b'Teclado', response.content)
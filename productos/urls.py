@@ -1,5 +1,5 @@
 from django.urls import path, include
-from.views import (ProductoListView, ProductoDeleteView, DemoView,ProductoListAPIView,ProductoDeleteView,ProductoDeleteAPIView,ProductoDeleteAPIView,ProductoAjaxView,ProductoDetailAPIView)
+from.views import (ProductoListView, ProductoDeleteView, DemoView,ProductoListAPIView,ProductoDeleteView,ProductoDeleteAPIView,ProductoDeleteAPIView,ProductoAjaxView,ProductoDetailAPIView,ProductoCacheAPIView)
 
 urlpatterns = [
 
@@ -7,6 +7,7 @@ urlpatterns = [
     path('api/productos/', ProductoListAPIView.as_view(), name='producto-list-api'),
     path('api/productos/<int:pk>/', ProductoDetailAPIView.as_view(), name='producto-delete-api'),
     path('api/productos/<int:pk>/delete/', ProductoDeleteAPIView.as_view(), name='producto-delete-api'),
+    path('api/productos/cache/', ProductoCacheAPIView.as_view(), name='producto-cache-api'),
 
     #AJAX ENDPOINTS para el frontend
     path('ajax/productos/', ProductoAjaxView.as_view(), name='producto-ajax'),
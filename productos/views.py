@@ -1,20 +1,62 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from django.views.generic import ListView, DeleteView
+from django.views.generic import ListView, DeleteView, TemplateView
 from django.urls import reverse_lazy
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 import json
 from .serializers import ProductoSerializer
 from rest_framework import generics
+from rest_framework.permissions import BasePermission
+from inventario.iteracion import config as config_iteracion, respuesta_json_en_bloques
+from inventario.actualizaciones import ConflictoDeVersion, aplicar_cambios, etag, guardar_cambios, version_esperada
 from .models import Producto
+from .cache import cache_productos
+
+def detalle_json(pk):
+    """JSON de detalle ya codificado y ETag del producto, desde la cache si esta."""
+    entrada = cache_productos.get(pk)
+    if entrada is None:
+        generacion = cache_productos.generacion(pk)
+        producto = Producto.objects.get(pk=pk)
+        cuerpo = json.dumps(ProductoSerializer(producto).data, cls=DjangoJSONEncoder).encode('utf-8')
+        entrada = (cuerpo, etag(producto))
+        cache_productos.set(pk, entrada, generacion)
+    return entrada
+
+
+def cache_aplicable(view):
+    """La cache responde sin pasar por get_object(), asi que solo se usa si la
+    vista no tiene filtros ni permisos por objeto. Los permisos de vista ya los
+    comprobo DRF en initial() antes de llegar al handler."""
+    return not view.filter_backends and all(
+        type(permiso).has_object_permission is BasePermission.has_object_permission
+        for permiso in view.get_permissions()
+    )
+
+
+def respuesta_detalle(view, pk):
+    if cache_aplicable(view):
+        cuerpo, etag_producto = detalle_json(pk)
+    else:
+        producto = view.get_object()
+        cuerpo = json.dumps(view.get_serializer(producto).data, cls=DjangoJSONEncoder).encode('utf-8')
+        etag_producto = etag(producto)
+    response = HttpResponse(cuerpo, content_type='application/json')
+    response['ETag'] = etag_producto
+    return response
+
 
 #Listar productos
 class ProductoListAPIView(generics.ListCreateAPIView):
     queryset = Producto.objects.all()
     serializer_class = ProductoSerializer
 
+    def list(self, request, *args, **kwargs):
+        return respuesta_json_en_bloques(self.filter_queryset(self.get_queryset()), self.get_serializer_class())
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
@@ -39,14 +81,15 @@ class ProductoDeleteAPIView(generics.DestroyAPIView):
 
 class ProductoListView(ListView):
     model = Producto
-    template_name = 'productos/producto_list-html'
+    template_name = 'productos/producto_list.html'
     context_object_name = 'productos'
     ordering = ['-creado']
 
-class DemoView(ListView):
-    model = Producto
+    def get_paginate_by(self, queryset):
+        return config_iteracion()['FILAS_POR_PAGINA']
+
+class DemoView(TemplateView):
     template_name = 'productos/demo.html'
-    context_object_name = 'productos'
 
 class ProductoDeleteView(DeleteView):
     model = Producto
@@ -68,9 +111,7 @@ class ProductoDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
 
     def retrieve(self, request, *args, **kwargs):
         try:
-            instance = self.get_object()
-            serializer = self.get_serializer(instance)
-            return JsonResponse(serializer.data, status=200)
+            return respuesta_detalle(self, int(kwargs['pk']))
         except Exception as e:
             return JsonResponse({
             'error': 'Producto no encontrado',
@@ -86,8 +127,15 @@ class ProductoDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
                     'error': 'Datos invalidos',
                     'detalles': serializer.errors
                 }, status=400)
-            self.perform_update(serializer)
-            return JsonResponse(serializer.data, status=200)
+            campos = aplicar_cambios(instance, serializer.validated_data)
+            guardar_cambios(instance, campos, version_esperada(request))
+            response = JsonResponse(serializer.data, status=200)
+            response['ETag'] = etag(instance)
+            return response
+        except ConflictoDeVersion:
+            return JsonResponse({
+                'error': 'El producto fue modificado por otro cliente'
+            }, status=412)
         except Producto.DoesNotExist:
             return JsonResponse({
                 'error': 'Producto no encontrado'
@@ -152,30 +200,45 @@ class ProductoAjaxView(generics.GenericAPIView):
             producto = get_object_or_404(Producto, pk=pk)
             data = json.loads(request.body)
 
-            producto.nombre = data.get('nombre', producto.nombre)
-            producto.descripcion = data.get('descripcion', producto.descripcion)
-            producto.precio = data.get('precio', producto.precio)
-            producto.stock = data.get('stock', producto.stock)
-            producto.save()
-            return JsonResponse({
+            # Solo se escriben las columnas que cambiaron realmente
+            cambios = {campo: data[campo] for campo in ('nombre', 'descripcion', 'precio', 'stock') if campo in data}
+            campos = aplicar_cambios(producto, cambios)
+            guardar_cambios(producto, campos, version_esperada(request))
+            response = JsonResponse({
                 'id': producto.id,
                 'nombre': producto.nombre,
                 'descripcion': producto.descripcion,
                 'precio': str(producto.precio),
                 'creado': producto.creado.strftime('%d/%m/%Y %H:%M'),
                 'stock': producto.stock,
+                'version': producto.version,
             })
+            response['ETag'] = etag(producto)
+            return response
+        except ConflictoDeVersion:
+            return JsonResponse({'error': 'El producto fue modificado por otro cliente'}, status=412)
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=400)
 
 
     def get(self, request, *args, **kwargs):
-        productos = self.get_queryset()
-        serializer = self.get_serializer(productos, many=True)
-        return JsonResponse(serializer.data, safe=False)
+        pk = kwargs.get('pk')
+        if pk is not None:
+            try:
+                return respuesta_detalle(self, int(pk))
+            except (Producto.DoesNotExist, Http404):
+                return JsonResponse({'error': 'Producto no encontrado'}, status=404)
+        return respuesta_json_en_bloques(self.get_queryset(), self.get_serializer_class())
 
     def delete(self, request, *args, **kwargs):
         pk = kwargs.get('pk')
         producto = get_object_or_404(Producto, pk=pk)
         producto.delete()
         return JsonResponse({'message': 'Producto eliminado exitosamente.'}, status=204)
+
+
+class ProductoCacheAPIView(generics.GenericAPIView):
+    """Metricas de la cache de detalle de este proceso."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(cache_productos.estadisticas())
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+from productos.models import Producto
+from usuarios.models import Usuario
+from reportes.models import Rollup
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye los rollups de reportes a partir de las tablas Producto y Usuario. '
+        'El historial de activaciones no se conserva: cada usuario cuenta con su estado '
+        'actual en la fecha de registro.'
+    )
+
+    def handle(self, *args, **options):
+        filas = []
+        productos = (Producto.objects.annotate(dia=TruncDate('creado'))
+                     .values('dia').annotate(total=Count('id')))
+        filas += [Rollup(serie=Rollup.PRODUCTOS_CREADOS, fecha=p['dia'], total=p['total']) for p in productos]
+
+        usuarios = (Usuario.objects.annotate(dia=TruncDate('fecha_registro'))
+                    .values('dia', 'activo').annotate(total=Count('id')))
+        registrados = {}
+        for u in usuarios:
+            registrados[u['dia']] = registrados.get(u['dia'], 0) + u['total']
+            serie = Rollup.USUARIOS_ACTIVOS if u['activo'] else Rollup.USUARIOS_INACTIVOS
+            filas.append(Rollup(serie=serie, fecha=u['dia'], total=u['total']))
+        filas += [Rollup(serie=Rollup.USUARIOS_REGISTRADOS, fecha=dia, total=total)
+                  for dia, total in registrados.items()]
+
+        with transaction.atomic():
+            Rollup.objects.all().delete()
+            Rollup.objects.bulk_create(filas, batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f'{len(filas)} rollups recalculados.'))
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Rollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('serie', models.CharField(choices=[('productos_creados', 'Productos creados'), ('usuarios_registrados', 'Usuarios registrados'), ('usuarios_activos', 'Usuarios activos'), ('usuarios_inactivos', 'Usuarios inactivos')], max_length=30)),
+                ('fecha', models.DateField()),
+                ('total', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='rollup',
+            constraint=models.UniqueConstraint(fields=('serie', 'fecha'), name='rollup_serie_fecha_unica'),
+        ),
+    ]
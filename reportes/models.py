@@ -0,0 +1,41 @@
+from django.db import models
+from django.db.models import F
+
+
+class Rollup(models.Model):
+    """Total diario de una serie de reporte, mantenido de forma incremental."""
+
+    PRODUCTOS_CREADOS = 'productos_creados'
+    USUARIOS_REGISTRADOS = 'usuarios_registrados'
+    # Variacion diaria del numero de usuarios activos / inactivos
+    USUARIOS_ACTIVOS = 'usuarios_activos'
+    USUARIOS_INACTIVOS = 'usuarios_inactivos'
+
+    SERIES = [
+        (PRODUCTOS_CREADOS, 'Productos creados'),
+        (USUARIOS_REGISTRADOS, 'Usuarios registrados'),
+        (USUARIOS_ACTIVOS, 'Usuarios activos'),
+        (USUARIOS_INACTIVOS, 'Usuarios inactivos'),
+    ]
+
+    serie = models.CharField(max_length=30, choices=SERIES)
+    fecha = models.DateField()
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['serie', 'fecha'], name='rollup_serie_fecha_unica'),
+        ]
+
+    def __str__(self):
+        return f'{self.serie} {self.fecha}: {self.total}'
+
+    @classmethod
+    def sumar(cls, serie, fecha, delta=1):
+        """Suma ``delta`` al total del dia con un UPDATE atomico; crea la fila si no existe."""
+        if cls.objects.filter(serie=serie, fecha=fecha).update(total=F('total') + delta):
+            return
+        _, creado = cls.objects.get_or_create(serie=serie, fecha=fecha, defaults={'total': delta})
+        if not creado:
+            # Otra peticion creo la fila entre el UPDATE y el INSERT
+            cls.objects.filter(serie=serie, fecha=fecha).update(total=F('total') + delta)
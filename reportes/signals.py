@@ -0,0 +1,70 @@
+"""
+Mantenimiento incremental de los rollups de reportes.
+
+Cada alta suma uno al dia correspondiente; los cambios de ``activo`` en
+Usuario mueven una unidad entre las series de activos e inactivos del dia
+en que ocurren, y la baja de un usuario la resta ese mismo dia.
+
+El cambio de ``activo`` se decide en la base de datos y no con el valor
+leido en memoria: con dos instancias obsoletas del mismo usuario solo la
+que cambia realmente la fila mueve la unidad. Usuario.save() y delete()
+escriben la fila y los rollups en la misma transaccion.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from productos.models import Producto
+from usuarios.models import Usuario
+from .models import Rollup
+
+
+def _serie_estado(activo):
+    return Rollup.USUARIOS_ACTIVOS if activo else Rollup.USUARIOS_INACTIVOS
+
+
+@receiver(post_save, sender=Producto)
+def producto_creado(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Rollup.sumar(Rollup.PRODUCTOS_CREADOS, timezone.localdate(instance.creado))
+
+
+@receiver(pre_save, sender=Usuario)
+def usuario_por_guardar(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._activo_cambiado = False
+    if raw or instance._state.adding or (update_fields is not None and 'activo' not in update_fields):
+        return
+    # UPDATE condicional: solo cuenta si la fila tenia el valor contrario
+    filas = sender.objects.filter(pk=instance.pk).exclude(activo=instance.activo).update(activo=instance.activo)
+    instance._activo_cambiado = bool(filas)
+
+
+@receiver(post_save, sender=Usuario)
+def usuario_guardado(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        fecha = timezone.localdate(instance.fecha_registro)
+        Rollup.sumar(Rollup.USUARIOS_REGISTRADOS, fecha)
+        Rollup.sumar(_serie_estado(instance.activo), fecha)
+    elif getattr(instance, '_activo_cambiado', False):
+        hoy = timezone.localdate()
+        Rollup.sumar(_serie_estado(instance.activo), hoy)
+        Rollup.sumar(_serie_estado(not instance.activo), hoy, -1)
+    instance._activo_cambiado = False
+
+
+@receiver(pre_delete, sender=Usuario)
+def usuario_por_eliminar(sender, instance, **kwargs):
+    # delete() ya corre dentro de una transaccion; el bloqueo evita que dos
+    # bajas simultaneas resten dos veces
+    instance._activo_borrado = (sender.objects.select_for_update().filter(pk=instance.pk)
+                                .values_list('activo', flat=True).first())
+
+
+@receiver(post_delete, sender=Usuario)
+def usuario_eliminado(sender, instance, **kwargs):
+    activo = getattr(instance, '_activo_borrado', None)
+    if activo is not None:
+        Rollup.sumar(_serie_estado(activo), timezone.localdate(), -1)
@@ -0,0 +1,150 @@
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from productos.models import Producto
+from usuarios.models import Usuario
+from .models import Rollup
+
+
+def en_fecha(anio, mes, dia):
+    """Hace que auto_now_add use la fecha indicada."""
+    return mock.patch('django.utils.timezone.now', return_value=datetime(anio, mes, dia, 12, tzinfo=dt_timezone.utc))
+
+
+def totales():
+    return {(r.serie, r.fecha): r.total for r in Rollup.objects.exclude(total=0)}
+
+
+class RollupSumarTests(TestCase):
+
+    def test_crea_e_incrementa(self):
+        Rollup.sumar(Rollup.PRODUCTOS_CREADOS, date(2024, 1, 1))
+        Rollup.sumar(Rollup.PRODUCTOS_CREADOS, date(2024, 1, 1), 3)
+        Rollup.sumar(Rollup.PRODUCTOS_CREADOS, date(2024, 1, 1), -2)
+        Rollup.sumar(Rollup.PRODUCTOS_CREADOS, date(2024, 1, 2))
+        self.assertEqual(totales(), {
+            (Rollup.PRODUCTOS_CREADOS, date(2024, 1, 1)): 2,
+            (Rollup.PRODUCTOS_CREADOS, date(2024, 1, 2)): 1,
+        })
+
+
+class SenalesTests(TestCase):
+
+    def setUp(self):
+        with en_fecha(2024, 3, 5):
+            self.usuario = Usuario.objects.create(nombre='Ana', identificacion='1', email='ana@ejemplo.com')
+
+    def serie(self, serie):
+        return sum(Rollup.objects.filter(serie=serie).values_list('total', flat=True))
+
+    def test_cambio_de_activo_cuenta_el_dia_del_cambio(self):
+        self.usuario.activo = False
+        with en_fecha(2024, 3, 10):
+            self.usuario.save()
+        self.assertEqual(totales(), {
+            (Rollup.USUARIOS_REGISTRADOS, date(2024, 3, 5)): 1,
+            (Rollup.USUARIOS_ACTIVOS, date(2024, 3, 5)): 1,
+            (Rollup.USUARIOS_ACTIVOS, date(2024, 3, 10)): -1,
+            (Rollup.USUARIOS_INACTIVOS, date(2024, 3, 10)): 1,
+        })
+
+    def test_guardar_sin_cambiar_activo_no_mueve_nada(self):
+        self.usuario.nombre = 'Ana Maria'
+        self.usuario.save()
+        self.assertEqual(self.serie(Rollup.USUARIOS_ACTIVOS), 1)
+        self.assertEqual(self.serie(Rollup.USUARIOS_INACTIVOS), 0)
+
+    def test_instancias_obsoletas_cuentan_un_solo_cambio(self):
+        primera = Usuario.objects.get(pk=self.usuario.pk)
+        segunda = Usuario.objects.get(pk=self.usuario.pk)
+        for instancia in (primera, segunda):
+            instancia.activo = False
+            instancia.save()
+        self.assertEqual(self.serie(Rollup.USUARIOS_ACTIVOS), 0)
+        self.assertEqual(self.serie(Rollup.USUARIOS_INACTIVOS), 1)
+
+    def test_fallo_en_rollup_deshace_el_cambio(self):
+        self.usuario.activo = False
+        with mock.patch.object(Rollup, 'sumar', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.usuario.save()
+        self.assertTrue(Usuario.objects.get(pk=self.usuario.pk).activo)
+
+    def test_baja_resta_el_dia_de_la_baja(self):
+        with en_fecha(2024, 3, 6):
+            producto = Producto.objects.create(nombre='x', precio=1)
+        obsoleta = Usuario.objects.get(pk=self.usuario.pk)
+        with en_fecha(2024, 3, 7):
+            self.usuario.delete()
+            obsoleta.delete()
+            producto.delete()
+        self.assertEqual(totales(), {
+            (Rollup.USUARIOS_REGISTRADOS, date(2024, 3, 5)): 1,
+            (Rollup.USUARIOS_ACTIVOS, date(2024, 3, 5)): 1,
+            (Rollup.USUARIOS_ACTIVOS, date(2024, 3, 7)): -1,
+            (Rollup.PRODUCTOS_CREADOS, date(2024, 3, 6)): 1,
+        })
+
+
+class EndpointsTests(TestCase):
+
+    def setUp(self):
+        for dia, total in ((date(2024, 1, 1), 1), (date(2024, 1, 3), 2), (date(2024, 1, 8), 4), (date(2024, 2, 1), 8)):
+            Rollup.objects.create(serie=Rollup.PRODUCTOS_CREADOS, fecha=dia, total=total)
+
+    def datos(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [(d['fecha'], d['total']) for d in response.json()['datos']]
+
+    def test_agrupa_por_semana(self):
+        # 2024-01-01 es lunes
+        self.assertEqual(self.datos('/reportes/api/productos-creados/?periodo=semana'), [
+            ('2024-01-01', 3), ('2024-01-08', 4), ('2024-01-29', 8),
+        ])
+
+    def test_agrupa_por_mes_con_rango(self):
+        self.assertEqual(self.datos('/reportes/api/productos-creados/?periodo=mes&desde=2024-01-02'), [
+            ('2024-01-01', 6), ('2024-02-01', 8),
+        ])
+
+    def test_tendencia_acumulada(self):
+        Rollup.objects.create(serie=Rollup.USUARIOS_ACTIVOS, fecha=date(2024, 1, 1), total=2)
+        Rollup.objects.create(serie=Rollup.USUARIOS_ACTIVOS, fecha=date(2024, 2, 1), total=1)
+        Rollup.objects.create(serie=Rollup.USUARIOS_INACTIVOS, fecha=date(2024, 2, 1), total=1)
+        response = self.client.get('/reportes/api/usuarios-activos/?periodo=mes&desde=2024-02-01')
+        self.assertEqual(response.json()['datos'], [{'fecha': '2024-02-01', 'activos': 3, 'inactivos': 1}])
+
+    def test_periodo_invalido(self):
+        self.assertEqual(self.client.get('/reportes/api/productos-creados/?periodo=anio').status_code, 400)
+
+
+class RecalcularTests(TestCase):
+
+    def crear(self):
+        for i, (anio, mes, dia) in enumerate([(2023, 12, 31), (2024, 1, 1), (2024, 1, 1), (2024, 2, 15)]):
+            with en_fecha(anio, mes, dia):
+                Producto.objects.create(nombre=f'p{i}', precio=1)
+                usuario = Usuario.objects.create(
+                    nombre=f'u{i}', identificacion=str(i), email=f'u{i}@ejemplo.com', activo=i % 2 == 0)
+        return usuario
+
+    def test_recalculo_coincide_con_incremental_sin_cambios_de_estado(self):
+        self.crear()
+        incremental = totales()
+        call_command('recalcular_reportes', stdout=StringIO())
+        self.assertEqual(totales(), incremental)
+
+    def test_recalculo_no_reconstruye_cambios_pasados(self):
+        usuario = self.crear()
+        usuario.activo = True
+        with en_fecha(2024, 3, 1):
+            usuario.save()
+        call_command('recalcular_reportes', stdout=StringIO())
+        # El usuario cuenta como activo desde su registro, no desde el cambio
+        self.assertEqual(totales()[(Rollup.USUARIOS_ACTIVOS, date(2024, 2, 15))], 1)
+        self.assertNotIn((Rollup.USUARIOS_ACTIVOS, date(2024, 3, 1)), totales())
@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import ProductosCreadosView, UsuariosRegistradosView, UsuariosActivosView
+
+urlpatterns = [
+    # Reportes calculados sobre las tablas de rollup
+    path('api/productos-creados/', ProductosCreadosView.as_view(), name='reporte-productos-creados'),
+    path('api/usuarios-registrados/', UsuariosRegistradosView.as_view(), name='reporte-usuarios-registrados'),
+    path('api/usuarios-activos/', UsuariosActivosView.as_view(), name='reporte-usuarios-activos'),
+]
@@ -0,0 +1,94 @@
+from datetime import date
+
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.http import JsonResponse
+from rest_framework import generics
+
+from .models import Rollup
+
+PERIODOS = {
+    'semana': TruncWeek,
+    'mes': TruncMonth,
+}
+
+
+def _rango(request):
+    """Lee ``desde``/``hasta`` (ISO, ambos inclusive) del query string."""
+    desde = request.GET.get('desde')
+    hasta = request.GET.get('hasta')
+    return (date.fromisoformat(desde) if desde else None,
+            date.fromisoformat(hasta) if hasta else None)
+
+
+def _totales(serie, desde, hasta, periodo):
+    """Totales de ``serie`` agrupados por ``periodo`` leyendo solo la tabla de rollups."""
+    qs = Rollup.objects.filter(serie=serie)
+    if desde:
+        qs = qs.filter(fecha__gte=desde)
+    if hasta:
+        qs = qs.filter(fecha__lte=hasta)
+    if periodo in PERIODOS:
+        qs = qs.annotate(periodo=PERIODOS[periodo]('fecha'))
+    else:
+        qs = qs.annotate(periodo=F('fecha'))
+    filas = qs.values('periodo').annotate(suma=Sum('total')).order_by('periodo')
+    return {f['periodo']: f['suma'] for f in filas}
+
+
+class SerieReporteView(generics.GenericAPIView):
+    """Totales por dia, semana o mes de una serie de Rollup."""
+    serie = None
+    periodo_por_defecto = 'dia'
+
+    def get_rango_y_periodo(self, request):
+        periodo = request.GET.get('periodo', self.periodo_por_defecto)
+        if periodo != 'dia' and periodo not in PERIODOS:
+            raise ValueError(f'Periodo no soportado: {periodo}')
+        desde, hasta = _rango(request)
+        return desde, hasta, periodo
+
+    def get(self, request, *args, **kwargs):
+        try:
+            desde, hasta, periodo = self.get_rango_y_periodo(request)
+        except ValueError as e:
+            return JsonResponse({'error': 'Parametros invalidos', 'detalles': str(e)}, status=400)
+        totales = _totales(self.serie, desde, hasta, periodo)
+        return JsonResponse({
+            'serie': self.serie,
+            'periodo': periodo,
+            'datos': [{'fecha': f.isoformat(), 'total': t} for f, t in totales.items()],
+        })
+
+
+class ProductosCreadosView(SerieReporteView):
+    serie = Rollup.PRODUCTOS_CREADOS
+
+
+class UsuariosRegistradosView(SerieReporteView):
+    serie = Rollup.USUARIOS_REGISTRADOS
+    periodo_por_defecto = 'semana'
+
+
+class UsuariosActivosView(SerieReporteView):
+    """Numero de usuarios activos e inactivos al final de cada periodo."""
+
+    def get(self, request, *args, **kwargs):
+        try:
+            desde, hasta, periodo = self.get_rango_y_periodo(request)
+        except ValueError as e:
+            return JsonResponse({'error': 'Parametros invalidos', 'detalles': str(e)}, status=400)
+
+        acumulado = {}
+        variaciones = {}
+        for clave, serie in (('activos', Rollup.USUARIOS_ACTIVOS), ('inactivos', Rollup.USUARIOS_INACTIVOS)):
+            previo = Rollup.objects.filter(serie=serie)
+            acumulado[clave] = (previo.filter(fecha__lt=desde).aggregate(s=Sum('total'))['s'] or 0) if desde else 0
+            variaciones[clave] = _totales(serie, desde, hasta, periodo)
+
+        datos = []
+        for fecha in sorted(set(variaciones['activos']) | set(variaciones['inactivos'])):
+            for clave in acumulado:
+                acumulado[clave] += variaciones[clave].get(fecha, 0)
+            datos.append({'fecha': fecha.isoformat(), **acumulado})
+        return JsonResponse({'serie': 'usuarios_activos', 'periodo': periodo, 'datos': datos})
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 class Usuario(models.Model):
     nombre = models.CharField(max_length=100)
@@ -6,6 +6,13 @@ class Usuario(models.Model):
     email = models.EmailField(unique=True)
     fecha_registro = models.DateTimeField(auto_now_add=True)
     activo = models.BooleanField(default=True)
+    version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
-        return self.nombre
\ No newline at end of file
+        return self.nombre
+
+    def save(self, *args, **kwargs):
+        # Los receptores de pre_save/post_save (rollups de reportes) escriben
+        # en la misma transaccion que la fila
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
\ No newline at end of file
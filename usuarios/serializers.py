@@ -4,4 +4,5 @@ from .models import Usuario
 class UsuarioSerializer(serializers.ModelSerializer):
     class Meta:
         model = Usuario
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        read_only_fields = ['version']
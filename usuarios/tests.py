@@ -1,3 +1,55 @@
+import json
+
 from django.test import TestCase
 
-# Create your tests here.
+from inventario import limites
+from reportes.models import Rollup
+from .models import Usuario
+
+
+class ActualizacionParcialTests(TestCase):
+
+    def setUp(self):
+        limites._memoria.limpiar()
+        self.usuario = Usuario.objects.create(nombre='Ana', identificacion='1', email='ana@ejemplo.com')
+
+    def put_ajax(self, datos, **extra):
+        return self.client.put(f'/usuarios/ajax/usuarios/{self.usuario.pk}/', json.dumps(datos),
+                               content_type='application/json', **extra)
+
+    def total(self, serie):
+        return sum(Rollup.objects.filter(serie=serie).values_list('total', flat=True))
+
+    def test_put_sin_cambios_no_incrementa_version(self):
+        response = self.put_ajax({'nombre': 'Ana', 'activo': True})
+        self.assertEqual(response.status_code, 200)
+        self.usuario.refresh_from_db()
+        self.assertEqual(self.usuario.version, 0)
+
+    def test_if_match_obsoleto_devuelve_412(self):
+        self.put_ajax({'nombre': 'Ana Maria'})
+        response = self.put_ajax({'activo': False}, HTTP_IF_MATCH='"0"')
+        self.assertEqual(response.status_code, 412)
+        response = self.client.patch(f'/usuarios/api/usuarios/{self.usuario.pk}/', json.dumps({'activo': False}),
+                                     content_type='application/json', HTTP_IF_MATCH='"0"')
+        self.assertEqual(response.status_code, 412)
+        self.usuario.refresh_from_db()
+        self.assertTrue(self.usuario.activo)
+
+    def test_update_condicional_actualiza_rollups(self):
+        self.assertEqual(self.total(Rollup.USUARIOS_ACTIVOS), 1)
+        response = self.put_ajax({'activo': False}, HTTP_IF_MATCH='"0"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.total(Rollup.USUARIOS_ACTIVOS), 0)
+        self.assertEqual(self.total(Rollup.USUARIOS_INACTIVOS), 1)
+
+
+class ListaHtmlTests(TestCase):
+
+    def test_paginacion_lee_la_configuracion_en_cada_peticion(self):
+        for i in range(3):
+            Usuario.objects.create(nombre=f'u{i}', identificacion=str(i), email=f'u{i}@ejemplo.com')
+        with self.settings(INVENTARIO_ITERACION={'FILAS_POR_PAGINA': 1}):
+            response = self.client.get('/usuarios/usuarios/')
+        self.assertEqual(len(response.context['usuarios']), 1)
+        self.assertEqual(response.context['page_obj'].paginator.num_pages, 3)
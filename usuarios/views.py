@@ -1,6 +1,6 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from django.views.generic import ListView, DeleteView
+from django.views.generic import ListView, DeleteView, TemplateView
 from django.urls import reverse_lazy
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -9,6 +9,8 @@ import json
 from django.db import IntegrityError
 from .serializers import UsuarioSerializer
 from rest_framework import generics
+from inventario.iteracion import config as config_iteracion, respuesta_json_en_bloques
+from inventario.actualizaciones import ConflictoDeVersion, aplicar_cambios, etag, guardar_cambios, version_esperada
 from .models import Usuario
 
 def _to_bool(val):
@@ -24,6 +26,9 @@ class UsuarioListAPIView(generics.ListCreateAPIView):
     queryset = Usuario.objects.all()
     serializer_class = UsuarioSerializer
 
+    def list(self, request, *args, **kwargs):
+        return respuesta_json_en_bloques(self.filter_queryset(self.get_queryset()), self.get_serializer_class())
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
@@ -51,10 +56,11 @@ class UsuarioListView(ListView):
     context_object_name = 'usuarios'
     ordering = ['-fecha_registro']
 
-class DemoView(ListView):
-    model = Usuario
+    def get_paginate_by(self, queryset):
+        return config_iteracion()['FILAS_POR_PAGINA']
+
+class DemoView(TemplateView):
     template_name = 'usuarios/demo.html'
-    context_object_name = 'usuarios'
 
 class UsuarioDeleteView(DeleteView):
     model = Usuario
@@ -77,7 +83,9 @@ class UsuarioDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
         try:
             instance = self.get_object()
             serializer = self.get_serializer(instance)
-            return JsonResponse(serializer.data, status=200)
+            response = JsonResponse(serializer.data, status=200)
+            response['ETag'] = etag(instance)
+            return response
         except Exception as e:
             return JsonResponse({
             'error': 'Usuario no encontrado',
@@ -93,8 +101,15 @@ class UsuarioDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
                     'error': 'Datos invalidos',
                     'detalles': serializer.errors
                 }, status=400)
-            self.perform_update(serializer)
-            return JsonResponse(serializer.data, status=200)
+            campos = aplicar_cambios(instance, serializer.validated_data)
+            guardar_cambios(instance, campos, version_esperada(request))
+            response = JsonResponse(serializer.data, status=200)
+            response['ETag'] = etag(instance)
+            return response
+        except ConflictoDeVersion:
+            return JsonResponse({
+                'error': 'El usuario fue modificado por otro cliente'
+            }, status=412)
         except Usuario.DoesNotExist:
             return JsonResponse({
                 'error': 'Usuario no encontrado'
@@ -185,32 +200,37 @@ class UsuarioAjaxView(generics.GenericAPIView):
             if not nombre or not identificacion or not email:
                 return JsonResponse({'error': 'Los campos nombre, identificacion y email no pueden quedar vacíos.'}, status=400)
 
-            # Aplicar cambios
-            usuario.nombre = nombre
-            usuario.identificacion = identificacion
-            usuario.email = email
-            usuario.activo = activo
+            # Aplicar cambios (solo se escriben las columnas modificadas)
+            campos = aplicar_cambios(usuario, {
+                'nombre': nombre,
+                'identificacion': identificacion,
+                'email': email,
+                'activo': activo,
+            })
 
             try:
-                usuario.save()
+                guardar_cambios(usuario, campos, version_esperada(request))
             except IntegrityError:
                 return JsonResponse({'error': 'Identificación o email ya registrados por otro usuario.'}, status=400)
+            except ConflictoDeVersion:
+                return JsonResponse({'error': 'El usuario fue modificado por otro cliente.'}, status=412)
 
-            return JsonResponse({
+            response = JsonResponse({
                 'id': usuario.id,
                 'nombre': usuario.nombre,
                 'identificacion': usuario.identificacion,
                 'email': usuario.email,
                 'fecha_registro': usuario.fecha_registro.strftime('%d/%m/%Y %H:%M'),
                 'activo': usuario.activo,
+                'version': usuario.version,
             })
+            response['ETag'] = etag(usuario)
+            return response
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=400)
 
     def get(self, request, *args, **kwargs):
-        usuarios = self.get_queryset()
-        serializer = self.get_serializer(usuarios, many=True)
-        return JsonResponse(serializer.data, safe=False)
+        return respuesta_json_en_bloques(self.get_queryset(), self.get_serializer_class())
 
     def delete(self, request, *args, **kwargs):
         pk = kwargs.get('pk')